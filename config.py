@@ -2,13 +2,15 @@
 Configuration settings for the Financial RAG System
 """
 import os
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+@dataclass(frozen=True)
 class Settings:
-    """Application settings"""
+    """Application settings (environment is read once at import; instances are immutable)"""
     
     # API Keys
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -18,11 +20,22 @@ class Settings:
     OPENAI_MODEL: str = "gpt-4"
     OLLAMA_MODEL: str = "llama3.1"
     OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
     
     # Vector Database Settings
     VECTOR_DB_TYPE: str = "chroma"
     CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # faiss.index_factory description for the FAISS store
+    # ("SQ8" = 8-bit scalar quantizer, "SQfp16" = half precision, "Flat" = exact float32)
+    FAISS_INDEX_FACTORY: str = "SQ8"
+    # Inverted-file product quantizer used once the corpus is large enough to train it;
+    # PQ16 learns 256 centroids per sub-quantizer, and FAISS wants ~39 points per centroid
+    FAISS_IVF_FACTORY: str = "IVF64,PQ16"
+    FAISS_IVF_MIN_VECTORS: int = 256 * 39
+    FAISS_NPROBE: int = 8
+    # Folder the FAISS store is saved to and reloaded from while the datasets are unchanged
+    FAISS_INDEX_PATH: str = "./faiss_index"
     
     # Database Settings
     DATABASE_URL: str = "sqlite:///./financial_data.db"
@@ -30,15 +43,36 @@ class Settings:
     # API Settings
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    # Defaults to 1; see README "Local Development Setup" before raising it
+    API_WORKERS: int = int(os.getenv("API_WORKERS", 1))
+    API_RELOAD: bool = os.getenv("DEV") == "1"
+    
+    # Request batching: concurrent /analyze calls are answered with one LLM call.
+    # Batched queries use RAG context but skip the tool-using agent.
+    ENABLE_REQUEST_BATCHING: bool = False
+    BATCH_MAX_SIZE: int = 8
+    BATCH_WINDOW_MS: int = 250
     
     # Streamlit Settings
     STREAMLIT_HOST: str = "0.0.0.0"
     STREAMLIT_PORT: int = 8501
     
     # RAG Settings
-    CHUNK_SIZE: int = 1000
-    CHUNK_OVERLAP: int = 200
+    # Chunk sizes are in embedding-model tokens (all-MiniLM-L6-v2 truncates at 256)
+    CHUNK_SIZE: int = 200
+    CHUNK_OVERLAP: int = 20
     MAX_RETRIEVED_DOCS: int = 5
+    MAX_HISTORY_MESSAGES: int = 10
+
+    # Semantic Cache Settings
+    # Off by default: queries differing only in the company or sector name can clear
+    # the similarity threshold and would be answered with another entity's analysis
+    ENABLE_SEMANTIC_CACHE: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1000
+
+    # In-memory OpenAI embeddings kept per client (least recently used evicted first)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 10000
     
     # Guardrails Settings
     ENABLE_GUARDRAILS: bool = True
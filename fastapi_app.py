@@ -1,11 +1,17 @@
 """
 FastAPI Backend for Financial RAG System
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 import uvicorn
+import json
+import time
 from datetime import datetime
 import sys
 import os
@@ -15,6 +21,7 @@ sys.path.append('.')
 sys.path.append('src')
 
 from financial_agent import FinancialRAGAgent, create_full_agent
+from src.ollama_client import aclose_http_client
 from config import settings
 
 # Pydantic models
@@ -36,11 +43,122 @@ class SystemStatus(BaseModel):
     rag_enabled: bool
     tools_enabled: bool
 
+class QueryBatcher:
+    """Collects concurrent queries and answers them with one batched LLM call"""
+
+    def __init__(self, agent: FinancialRAGAgent, max_size: int, window_ms: int):
+        self.agent = agent
+        self.max_size = max_size
+        self.window = window_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._pending: Set[asyncio.Future] = set()
+        self._inflight: Set[asyncio.Task] = set()
+        self._runner: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def start(self):
+        """Start collecting batches on the running event loop"""
+        self._runner = asyncio.create_task(self.run())
+
+    async def submit(self, query: str) -> Dict[str, Any]:
+        """Enqueue a query and wait for its result"""
+        if self._closed:
+            raise RuntimeError("Request batcher is shut down")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        try:
+            await self.queue.put((query, future))
+            return await future
+        finally:
+            self._pending.discard(future)
+
+    async def run(self):
+        """Drain the queue in batches of up to max_size within the batching window"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Answer the batch in the background so collection continues while the LLM works
+            task = asyncio.create_task(self._answer(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _answer(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Run one batch through the agent and resolve its futures"""
+        queries = [query for query, _ in batch]
+        try:
+            results = await asyncio.to_thread(self.agent.analyze_batch, queries)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        """Stop batching and fail every query that has not been answered yet"""
+        self._closed = True
+        tasks = list(self._inflight) + ([self._runner] if self._runner else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(RuntimeError("API is shutting down"))
+
+# Static reference data served by /companies and /sectors
+COMPANIES_RESPONSE = {"companies": ["TechCorp", "FinanceInc", "HealthPlus", "EnergyGiant", "RetailMax"]}
+SECTORS_RESPONSE = {"sectors": ["Technology", "Finance", "Healthcare", "Energy", "Retail"]}
+
+# Global agent instance
+financial_agent: Optional[FinancialRAGAgent] = None
+query_batcher: Optional[QueryBatcher] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the financial agent on startup
+
+    The vector store is built in the background so the API starts serving
+    immediately; /analyze answers without RAG context until it is ready.
+    """
+    global financial_agent, query_batcher
+    print("🚀 Starting Financial RAG System API...")
+    try:
+        financial_agent = create_full_agent(background_rag=True)
+        print("✅ Financial agent initialized (RAG warming up in background)")
+    except Exception as e:
+        print(f"❌ Failed to initialize: {e}")
+        financial_agent = None
+
+    if financial_agent and settings.ENABLE_REQUEST_BATCHING:
+        query_batcher = QueryBatcher(financial_agent, settings.BATCH_MAX_SIZE, settings.BATCH_WINDOW_MS)
+        query_batcher.start()
+        print(f"✅ Request batching enabled (up to {settings.BATCH_MAX_SIZE} queries / {settings.BATCH_WINDOW_MS} ms)")
+
+    yield
+
+    if query_batcher:
+        await query_batcher.close()
+    await aclose_http_client()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Financial RAG System API",
     description="Advanced Financial Analysis using RAG, LLM, and AI Agents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -51,21 +169,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global agent instance
-financial_agent: Optional[FinancialRAGAgent] = None
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the financial agent on startup"""
-    global financial_agent
-    print("🚀 Starting Financial RAG System API...")
-    try:
-        financial_agent = create_full_agent()
-        print("✅ Financial agent initialized")
-    except Exception as e:
-        print(f"❌ Failed to initialize: {e}")
-        financial_agent = None
-
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -94,46 +197,82 @@ async def get_system_status():
     return SystemStatus(**status)
 
 @app.post("/analyze", response_model=QueryResponse)
-async def analyze_query(request: QueryRequest):
-    """Analyze financial query"""
+async def analyze_query(request: QueryRequest, batch: bool = True):
+    """Analyze financial query (pass ?batch=false to bypass request batching)"""
     if not financial_agent:
         raise HTTPException(status_code=503, detail="Agent not available")
 
-    start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
 
     try:
-        result = financial_agent.analyze_query(request.query)
-        end_time = datetime.now()
-        processing_time = int((end_time - start_time).total_seconds() * 1000)
+        if batch and query_batcher:
+            result = await query_batcher.submit(request.query)
+        else:
+            # analyze_query blocks on SQLite, vector search and LLM HTTP calls
+            result = await run_in_threadpool(financial_agent.analyze_query, request.query)
+        processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
 
         return QueryResponse(
             query=result["query"],
             response=result["response"],
             context_used=bool(result["context"]),
-            timestamp=end_time.isoformat(),
+            timestamp=datetime.now().isoformat(),
             processing_time_ms=processing_time
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.post("/analyze/stream")
+async def analyze_query_stream(request: QueryRequest):
+    """Stream the analysis of a financial query as Server-Sent Events"""
+    if not financial_agent:
+        raise HTTPException(status_code=503, detail="Agent not available")
+
+    async def event_stream():
+        try:
+            async for delta in financial_agent.astream_analyze(request.query):
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+            yield f"data: {json.dumps({'done': True})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': f'Analysis failed: {str(e)}'})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/ollama/models")
+async def get_ollama_models():
+    """List models installed on the Ollama server"""
+    if not financial_agent or not financial_agent.ollama_client:
+        raise HTTPException(status_code=503, detail="Ollama client not available")
+
+    client = financial_agent.ollama_client
+    if not await client.acheck_ollama_status():
+        raise HTTPException(status_code=503, detail=f"Ollama server not accessible at {client.base_url}")
+
+    return {"models": await client.alist_models()}
+
 @app.get("/companies")
 async def get_companies():
     """Get list of companies"""
-    return {"companies": ["TechCorp", "FinanceInc", "HealthPlus", "EnergyGiant", "RetailMax"]}
+    return COMPANIES_RESPONSE
 
 @app.get("/sectors")
 async def get_sectors():
     """Get list of sectors"""
-    return {"sectors": ["Technology", "Finance", "Healthcare", "Energy", "Retail"]}
+    return SECTORS_RESPONSE
 
 if __name__ == "__main__":
     print(f"🚀 Starting Financial RAG API server...")
     print(f"Host: {settings.API_HOST}:{settings.API_PORT}")
 
+    # Worker count limits are explained in README "Local Development Setup"
+    workers = 1 if settings.API_RELOAD else settings.API_WORKERS
+    print(f"Workers: {workers}" + (" (auto-reload)" if settings.API_RELOAD else ""))
+
     uvicorn.run(
         "fastapi_app:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
-        reload=True
+        workers=workers,
+        reload=settings.API_RELOAD
     )
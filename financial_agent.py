@@ -2,12 +2,15 @@
 Main Financial Agent Implementation
 Combines RAG, LLM, and Tools for financial analysis
 """
-from typing import List, Dict, Any, Optional, Union
-from langchain.agents import AgentExecutor, create_openai_functions_agent
+from collections import deque
+from typing import List, Dict, Any, Optional, Union, Deque, AsyncIterator
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+import asyncio
 import sys
 import os
+import re
+import threading
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -15,16 +18,115 @@ sys.path.append('src')
 
 from src.openai_client import OpenAIClient
 from src.ollama_client import OllamaClient
-from src.vector_store import VectorStoreManager, process_financial_datasets
-from src.agent_tools import get_financial_tools
+from src.agent_tools import get_financial_tools, on_data_reload, refresh_database
 from config import settings
 
+# System prompts are kept as byte-identical module constants and always sent
+# first, so provider-side prefix caching (OpenAI automatic prompt caching,
+# Ollama's KV cache of the previous prompt) can reuse them across requests.
+FINANCIAL_ANALYST_PROMPT = """
+You are a Senior Financial Analyst AI with access to financial databases and tools.
+
+## Your Role:
+- Provide clear, structured financial analysis
+- Use specific data from tools to support your insights
+- Validate data consistency before making conclusions
+- Focus on factual analysis over speculation
+
+## Response Structure:
+1. **Data Summary**: Key facts from your tools/database
+2. **Analysis**: What the data indicates
+3. **Context**: Relevant market/industry factors
+4. **Limitations**: Data gaps or uncertainties
+
+## Data Validation:
+- Check if company/sector combinations make sense
+- Flag inconsistent or mixed data sources
+- Distinguish between different companies if data seems mixed
+- Always cite specific sources for claims
+
+## Guidelines:
+- Use tools for calculations and data retrieval
+- Provide structured, bullet-pointed responses
+- Explain financial metrics clearly
+- Include appropriate disclaimers for investment-related content
+
+Remember: This is educational analysis only, not investment advice.
+"""
+
+DIRECT_LLM_PROMPT = "You are a financial analysis expert."
+
+def _format_doc_metadata(metadata: Dict[str, Any]) -> str:
+    """Format the company/date metadata of a retrieved document"""
+    company = metadata.get('company')
+    date = metadata.get('date')
+    if company is not None and date is not None:
+        return f"Company: {company} | Date: {date}"
+    if company is not None:
+        return f"Company: {company}"
+    if date is not None:
+        return f"Date: {date}"
+    return ""
+
+# Answers to a batched prompt start on their own line with "Answer n:"
+_BATCH_ANSWER_MARKER = re.compile(r'^\W*Answer (\d+)\W*?:\**\s*', re.MULTILINE)
+
+def _split_batch_answers(response: str, count: int) -> Optional[List[str]]:
+    """Split a numbered multi-answer response; None if it does not contain answers 1..count"""
+    markers = list(_BATCH_ANSWER_MARKER.finditer(response))
+    if [int(m.group(1)) for m in markers] != list(range(1, count + 1)):
+        return None
+
+    ends = [m.start() for m in markers[1:]] + [len(response)]
+    return [response[m.end():end].strip() for m, end in zip(markers, ends)]
+
+# Compiled agent executors, keyed by (tool names, model id, system prompt)
+_EXECUTOR_CACHE: Dict[tuple, tuple] = {}
+_EXECUTOR_CACHE_LOCK = threading.Lock()
+
+def _build_executor(tools: List, llm: Any, llm_id: str, system_prompt: str) -> tuple:
+    """Build the (prompt, agent, executor) triple, reusing it across agent instances"""
+    key = (tuple(t.name for t in tools), llm_id, system_prompt)
+    with _EXECUTOR_CACHE_LOCK:
+        if key not in _EXECUTOR_CACHE:
+            from langchain.agents import AgentExecutor, create_openai_functions_agent
+
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", system_prompt),
+                MessagesPlaceholder(variable_name="chat_history", optional=True),
+                ("human", "{input}"),
+                MessagesPlaceholder(variable_name="agent_scratchpad")
+            ])
+
+            agent = create_openai_functions_agent(
+                llm=llm,
+                tools=tools,
+                prompt=prompt
+            )
+
+            executor = AgentExecutor(
+                agent=agent,
+                tools=tools,
+                verbose=True,
+                max_iterations=10,
+                return_intermediate_steps=True
+            )
+
+            _EXECUTOR_CACHE[key] = (prompt, agent, executor)
+
+        return _EXECUTOR_CACHE[key]
+
 class FinancialRAGAgent:
     """Advanced Financial RAG Agent"""
 
     def __init__(self, use_openai: bool = True, use_ollama: bool = True, 
-                 enable_rag: bool = True, enable_tools: bool = True):
-        """Initialize the Financial RAG Agent"""
+                 enable_rag: bool = True, enable_tools: bool = True,
+                 background_rag: bool = False):
+        """Initialize the Financial RAG Agent
+
+        With background_rag, the vector store is built on a daemon thread and
+        queries are answered without retrieved context until it is ready.
+        """
         self.use_openai = use_openai
         self.use_ollama = use_ollama
         self.enable_rag = enable_rag
@@ -51,18 +153,22 @@ class FinancialRAGAgent:
         # Initialize RAG system
         self.vector_store_manager = None
         self.vector_store = None
+        self.semantic_cache = None
 
         if self.enable_rag:
-            self.setup_rag_system()
+            if background_rag:
+                threading.Thread(target=self.setup_rag_system, name="rag-setup", daemon=True).start()
+            else:
+                self.setup_rag_system()
 
         # Initialize agent tools
         self.tools = []
         if self.enable_tools:
-            self.tools = get_financial_tools()
+            self.tools = list(get_financial_tools())
             print(f"✓ Loaded {len(self.tools)} agent tools")
 
-        # Initialize conversation history
-        self.conversation_history: List = []
+        # Initialize conversation history (bounded to the window sent to the agent)
+        self.conversation_history: Deque = deque(maxlen=settings.MAX_HISTORY_MESSAGES)
 
         # Agent executor
         self.agent_executor = None
@@ -72,66 +178,37 @@ class FinancialRAGAgent:
     def setup_rag_system(self):
         """Setup RAG system with vector store"""
         try:
+            from src.vector_store import process_financial_datasets
+
             print("Setting up RAG system...")
             self.vector_store_manager, self.vector_store = process_financial_datasets()
             if self.vector_store:
                 print("✓ RAG system ready")
+
+            # The semantic cache shares the vector store's embedding model
+            if settings.ENABLE_SEMANTIC_CACHE and self.vector_store_manager:
+                from src.semantic_cache import SemanticCache
+
+                self.semantic_cache = SemanticCache(self.vector_store_manager.embeddings)
+                # Cached analyses describe the old data once the CSVs change
+                on_data_reload(self.semantic_cache.clear)
         except Exception as e:
             print(f"RAG setup error: {e}")
 
+    def _semantic_cache_lookup(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached analysis, first clearing the cache if the datasets changed"""
+        refresh_database()
+        return self.semantic_cache.get(user_query)
+
     def setup_agent_executor(self):
         """Setup LangChain agent executor"""
         try:
-            system_prompt = """
-                You are a Senior Financial Analyst AI with access to financial databases and tools.
-
-                ## Your Role:
-                - Provide clear, structured financial analysis
-                - Use specific data from tools to support your insights
-                - Validate data consistency before making conclusions
-                - Focus on factual analysis over speculation
-
-                ## Response Structure:
-                1. **Data Summary**: Key facts from your tools/database
-                2. **Analysis**: What the data indicates
-                3. **Context**: Relevant market/industry factors
-                4. **Limitations**: Data gaps or uncertainties
-
-                ## Data Validation:
-                - Check if company/sector combinations make sense
-                - Flag inconsistent or mixed data sources
-                - Distinguish between different companies if data seems mixed
-                - Always cite specific sources for claims
-
-                ## Guidelines:
-                - Use tools for calculations and data retrieval
-                - Provide structured, bullet-pointed responses
-                - Explain financial metrics clearly
-                - Include appropriate disclaimers for investment-related content
-
-                Remember: This is educational analysis only, not investment advice.
-                """
-
-
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", system_prompt),
-                MessagesPlaceholder(variable_name="chat_history", optional=True),
-                ("human", "{input}"),
-                MessagesPlaceholder(variable_name="agent_scratchpad")
-            ])
-
-            agent = create_openai_functions_agent(
-                llm=self.openai_client.chat_model,
-                tools=self.tools,
-                prompt=prompt
-            )
-
-            self.agent_executor = AgentExecutor(
-                agent=agent,
-                tools=self.tools,
-                verbose=True,
-                max_iterations=10,
-                return_intermediate_steps=True
+            llm_id = f"{self.openai_client.model}:{self.openai_client.temperature}"
+            _, _, self.agent_executor = _build_executor(
+                self.tools,
+                self.openai_client.chat_model,
+                llm_id,
+                FINANCIAL_ANALYST_PROMPT
             )
 
             print("✓ Agent executor ready")
@@ -146,19 +223,13 @@ class FinancialRAGAgent:
 
         try:
             docs = self.vector_store_manager.similarity_search(query, k=k)
-            context_parts = []
-
-            for i, doc in enumerate(docs, 1):
-                metadata_info = []
-                if 'company' in doc.metadata:
-                    metadata_info.append(f"Company: {doc.metadata['company']}")
-                if 'date' in doc.metadata:
-                    metadata_info.append(f"Date: {doc.metadata['date']}")
+            if not docs:
+                return ""
 
-                metadata_str = " | ".join(metadata_info)
-                context_parts.append(f"[{i}] {doc.page_content} ({metadata_str})")
-
-            return "\n\n".join(context_parts)
+            return "\n\n".join(
+                f"[{i}] {doc.page_content} ({_format_doc_metadata(doc.metadata)})"
+                for i, doc in enumerate(docs, 1)
+            )
 
         except Exception as e:
             print(f"Context retrieval error: {e}")
@@ -170,7 +241,7 @@ class FinancialRAGAgent:
             try:
                 result = self.agent_executor.invoke({
                     "input": prompt,
-                    "chat_history": self.conversation_history[-10:]
+                    "chat_history": list(self.conversation_history)
                 })
                 return result.get("output", "No response generated")
             except Exception as e:
@@ -180,12 +251,12 @@ class FinancialRAGAgent:
         try:
             if self.openai_client:
                 return self.openai_client.chat_with_system_prompt(
-                    "You are a financial analysis expert.",
+                    DIRECT_LLM_PROMPT,
                     prompt
                 )
             elif self.ollama_client:
                 return self.ollama_client.chat_with_system_prompt(
-                    "You are a financial analysis expert.",
+                    DIRECT_LLM_PROMPT,
                     prompt
                 )
             else:
@@ -193,10 +264,84 @@ class FinancialRAGAgent:
         except Exception as e:
             return f"LLM error: {str(e)}"
 
+    def build_enhanced_query(self, user_query: str, context: str) -> str:
+        """Combine the user question with retrieved context"""
+        if not context:
+            return user_query
+
+        return f"""
+            User Question: {user_query}
+
+            Relevant Context:
+            {context}
+
+            Please analyze this query using the provided context and your financial expertise.
+            """
+
+    async def astream_analyze(self, user_query: str) -> AsyncIterator[str]:
+        """Stream the analysis of a query as text deltas
+
+        Streams a direct LLM completion over the RAG-enhanced query; the
+        tool-using agent is not used because it only produces the answer
+        after all tool steps finish.
+        """
+        if self.semantic_cache:
+            cached = await asyncio.to_thread(self._semantic_cache_lookup, user_query)
+            if cached:
+                self.conversation_history.append(HumanMessage(content=user_query))
+                self.conversation_history.append(AIMessage(content=cached["response"]))
+                yield cached["response"]
+                return
+
+        client = self.openai_client or self.ollama_client
+        if not client:
+            yield "No LLM client available"
+            return
+
+        context = ""
+        if self.enable_rag:
+            context = await asyncio.to_thread(self.retrieve_relevant_context, user_query)
+
+        messages = [
+            SystemMessage(content=DIRECT_LLM_PROMPT),
+            HumanMessage(content=self.build_enhanced_query(user_query, context))
+        ]
+
+        parts = []
+        async for chunk in client.chat_model.astream(messages):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+
+        response = "".join(parts)
+        self.conversation_history.append(HumanMessage(content=user_query))
+        self.conversation_history.append(AIMessage(content=response))
+
+        if self.semantic_cache:
+            result = {
+                "query": user_query,
+                "context": context,
+                "response": response,
+                "sources": [],
+                "method": "stream"
+            }
+            await asyncio.to_thread(self.semantic_cache.put, user_query, result)
+
     def analyze_query(self, user_query: str) -> Dict[str, Any]:
         """Main method to analyze financial queries"""
         print(f"\n🔍 Analyzing: {user_query}")
 
+        # Reuse the answer to a near-identical earlier query
+        if self.semantic_cache:
+            cached = self._semantic_cache_lookup(user_query)
+            if cached:
+                print("⚡ Semantic cache hit")
+                cached["query"] = user_query
+                cached["method"] = "semantic_cache"
+                self.conversation_history.append(HumanMessage(content=user_query))
+                self.conversation_history.append(AIMessage(content=cached["response"]))
+                return cached
+
         analysis_result = {
             "query": user_query,
             "context": "",
@@ -212,16 +357,7 @@ class FinancialRAGAgent:
             analysis_result["context"] = context
 
         # Enhance query with context
-        enhanced_query = user_query
-        if analysis_result["context"]:
-            enhanced_query = f"""
-            User Question: {user_query}
-
-            Relevant Context:
-            {analysis_result["context"]}
-
-            Please analyze this query using the provided context and your financial expertise.
-            """
+        enhanced_query = self.build_enhanced_query(user_query, analysis_result["context"])
 
         # Get LLM response
         print("🤖 Generating analysis...")
@@ -232,8 +368,83 @@ class FinancialRAGAgent:
         self.conversation_history.append(HumanMessage(content=user_query))
         self.conversation_history.append(AIMessage(content=response))
 
+        if self.semantic_cache and not response.startswith(("LLM error:", "No LLM client available")):
+            self.semantic_cache.put(user_query, analysis_result)
+
         return analysis_result
 
+    def analyze_batch(self, user_queries: List[str]) -> List[Dict[str, Any]]:
+        """Answer several queries with a single LLM call
+
+        Falls back to analyze_query per query when there is a single query,
+        no LLM client, or the numbered response cannot be split.
+        """
+        client = self.openai_client or self.ollama_client
+        if len(user_queries) < 2 or not client:
+            return [self.analyze_query(query) for query in user_queries]
+
+        print(f"\n🔍 Analyzing batch of {len(user_queries)} queries")
+        results: List[Optional[Dict[str, Any]]] = [None] * len(user_queries)
+        pending = []
+        answered_individually = set()
+
+        for i, user_query in enumerate(user_queries):
+            cached = self._semantic_cache_lookup(user_query) if self.semantic_cache else None
+            if cached:
+                cached["query"] = user_query
+                cached["method"] = "semantic_cache"
+                results[i] = cached
+                continue
+
+            context = self.retrieve_relevant_context(user_query) if self.enable_rag else ""
+            pending.append((i, user_query, context))
+
+        if pending:
+            questions = []
+            for n, (_, user_query, context) in enumerate(pending, 1):
+                question = f"Question {n}: {user_query}"
+                if context:
+                    question += f"\nRelevant Context:\n{context}"
+                questions.append(question)
+
+            batch_prompt = (
+                "Answer each of the following questions separately. Start each answer "
+                "on a new line with 'Answer n:' where n is the question number.\n\n"
+                + "\n\n".join(questions)
+            )
+
+            try:
+                response = client.chat_with_system_prompt(DIRECT_LLM_PROMPT, batch_prompt)
+                answers = _split_batch_answers(response, len(pending))
+            except Exception as e:
+                print(f"Batch LLM error: {e}")
+                answers = None
+
+            if answers is None:
+                for i, user_query, _ in pending:
+                    results[i] = self.analyze_query(user_query)
+                    answered_individually.add(i)
+            else:
+                for (i, user_query, context), answer in zip(pending, answers):
+                    results[i] = {
+                        "query": user_query,
+                        "context": context,
+                        "response": answer,
+                        "sources": [],
+                        "method": "batch"
+                    }
+                    if self.semantic_cache:
+                        self.semantic_cache.put(user_query, results[i])
+
+        # analyze_query already recorded its own exchanges in the history
+        for i, result in enumerate(results):
+            if i in answered_individually:
+                continue
+            self.conversation_history.append(HumanMessage(content=result["query"]))
+            self.conversation_history.append(AIMessage(content=result["response"]))
+
+        return results
+
     def get_system_status(self) -> Dict[str, bool]:
         """Get status of all system components"""
         return {
@@ -244,13 +455,14 @@ class FinancialRAGAgent:
             "agent_executor_available": self.agent_executor is not None
         }
 
-def create_full_agent() -> FinancialRAGAgent:
+def create_full_agent(background_rag: bool = False) -> FinancialRAGAgent:
     """Create full-featured financial agent"""
     return FinancialRAGAgent(
         use_openai=True,
         use_ollama=True,
         enable_rag=True,
-        enable_tools=True
+        enable_tools=True,
+        background_rag=background_rag
     )
 
 def demo_financial_agent():
@@ -2,64 +2,229 @@
 Agent Tools Implementation
 SQL Database, Web Search, and Calculator tools
 """
+import ast
+import csv
+import operator
+import os
 import sqlite3
-import pandas as pd
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from langchain_core.tools import BaseTool, tool
-from langchain_community.tools import DuckDuckGoSearchRun
 import math
 import re
 
+# Source CSV for each database table
+DATA_FILES = {
+    'financial_news': 'data/financial_news_data.csv',
+    'stock_prices': 'data/stock_data.csv',
+    'economic_indicators': 'data/economic_indicators.csv'
+}
+
+# Indexes recreated after each reload (dropping a table drops its indexes)
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_news_company ON financial_news(company)',
+    'CREATE INDEX IF NOT EXISTS idx_news_sector ON financial_news(sector)',
+    'CREATE INDEX IF NOT EXISTS idx_news_date ON financial_news(date)',
+    'CREATE INDEX IF NOT EXISTS idx_stock_company_date ON stock_prices(company, date)'
+]
+
+MAX_RESULT_ROWS = 10
+QUERY_CACHE_SIZE = 512
+
+# Callbacks run after the tables are reloaded from changed CSVs
+_RELOAD_CALLBACKS: List[Callable[[], None]] = []
+
+# Statements that may be served from the query cache (confirmed read-only when executed)
+_READ_QUERY = re.compile(r'^\s*(select|with)\b', re.IGNORECASE)
+
+# Percentage rewrites used by financial_calculator
+_PCT_OF = re.compile(r'(\d+(?:\.\d+)?)%\s+of\s+(\d+(?:\.\d+)?)')
+_PCT = re.compile(r'(\d+(?:\.\d+)?)%')
+
+def _infer_column_type(values: List[str]) -> str:
+    """Infer the SQLite column type for a column of CSV values"""
+    column_type = 'INTEGER'
+    for value in values:
+        if value == '':
+            continue
+        try:
+            int(value)
+            continue
+        except ValueError:
+            pass
+        try:
+            float(value)
+            column_type = 'REAL'
+        except ValueError:
+            return 'TEXT'
+    return column_type
+
+def _format_value(value: Any) -> str:
+    """Format a single SQL result value for display"""
+    if value is None:
+        return "NaN"
+    if isinstance(value, float):
+        return f"{value:.6f}".rstrip('0').rstrip('.')
+    return str(value)
+
+def _format_rows(columns: List[str], rows: List[tuple]) -> str:
+    """Format SQL result rows as a right-aligned text table"""
+    table = [columns] + [[_format_value(v) for v in row] for row in rows]
+    widths = [max(len(r[i]) for r in table) for i in range(len(columns))]
+    return "\n".join(
+        " ".join(cell.rjust(width) for cell, width in zip(r, widths))
+        for r in table
+    )
+
 class FinancialDatabaseTool:
     """Tool for interacting with financial database"""
 
+    # CSV modification times of the last load, per database path
+    _loaded_mtimes: Dict[str, Dict[str, float]] = {}
+
     def __init__(self, db_path: str = "financial_data.db"):
         """Initialize database connection"""
         self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._query_cache: "OrderedDict[Tuple[str, tuple], str]" = OrderedDict()
         self.setup_database()
 
     def setup_database(self):
-        """Set up SQLite database with financial data"""
-        conn = sqlite3.connect(self.db_path)
-
+        """Set up SQLite database with financial data (skipped if the CSVs are unchanged)"""
         try:
-            # Load CSV data into database
-            news_df = pd.read_csv('data/financial_news_data.csv')
-            news_df.to_sql('financial_news', conn, if_exists='replace', index=False)
-
-            stock_df = pd.read_csv('data/stock_data.csv')
-            stock_df.to_sql('stock_prices', conn, if_exists='replace', index=False)
-
-            econ_df = pd.read_csv('data/economic_indicators.csv')
-            econ_df.to_sql('economic_indicators', conn, if_exists='replace', index=False)
+            mtimes = {table: os.path.getmtime(path) for table, path in DATA_FILES.items()}
+            if FinancialDatabaseTool._loaded_mtimes.get(self.db_path) == mtimes:
+                return
 
+            # Load CSV data into database
+            with self._lock:
+                # Never nest the reload inside a transaction left open by an earlier statement
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                self.conn.execute("BEGIN")
+                try:
+                    for table, path in DATA_FILES.items():
+                        self._load_csv(table, path)
+                    for statement in INDEXES:
+                        self.conn.execute(statement)
+                    self.conn.execute("ANALYZE")
+                    self.conn.commit()
+                except Exception:
+                    self.conn.rollback()
+                    raise
+
+            FinancialDatabaseTool._loaded_mtimes[self.db_path] = mtimes
+            self.clear_cache()
+            for callback in _RELOAD_CALLBACKS:
+                callback()
             print(f"✓ Database setup complete: {self.db_path}")
 
         except Exception as e:
             print(f"Error setting up database: {e}")
-        finally:
-            conn.close()
 
-    def query_database(self, query: str) -> str:
-        """Execute SQL query and return results"""
+    def _load_csv(self, table: str, path: str):
+        """Replace a table with the contents of a CSV file"""
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = [[value if value != '' else None for value in row] for row in reader]
+
+        columns = ", ".join(
+            f'"{name}" {_infer_column_type([row[i] or "" for row in rows])}'
+            for i, name in enumerate(header)
+        )
+        placeholders = ", ".join("?" for _ in header)
+
+        self.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        self.conn.execute(f'CREATE TABLE "{table}" ({columns})')
+        self.conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+
+    def clear_cache(self):
+        """Drop memoized query results after the tables change"""
+        with self._lock:
+            self._query_cache.clear()
+
+    def query_database(self, query: str, params: tuple = ()) -> str:
+        """Execute SQL query with optional ? parameters and return results (read queries are memoized)"""
+        key = (query, params)
+        cacheable = _READ_QUERY.match(query) is not None
+        if cacheable:
+            with self._lock:
+                if key in self._query_cache:
+                    self._query_cache.move_to_end(key)
+                    return self._query_cache[key]
+
+        result, read_only = self._execute_query(query, params)
+
+        with self._lock:
+            if not read_only:
+                # Writes, DDL and failed statements may have changed what cached reads return
+                self._query_cache.clear()
+            elif cacheable:
+                self._query_cache[key] = result
+                if len(self._query_cache) > QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        return result
+
+    def _execute_query(self, query: str, params: tuple = ()) -> Tuple[str, bool]:
+        """Execute SQL query and format the results, reporting whether it only read data"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            result = pd.read_sql_query(query, conn)
-            conn.close()
+            with self._lock:
+                changes = self.conn.total_changes
+                try:
+                    cursor = self.conn.execute(query, params)
+                    # DDL has no result columns; DML (even inside WITH) opens a transaction
+                    read_only = cursor.description is not None
+                    if read_only:
+                        columns = [col[0] for col in cursor.description]
+                        rows = cursor.fetchmany(MAX_RESULT_ROWS)
+                        remaining = sum(1 for _ in cursor)
+                    read_only = (read_only and not self.conn.in_transaction
+                                 and self.conn.total_changes == changes)
+                finally:
+                    # Queries are never committed: discard any write instead of holding the
+                    # shared connection (and the database write lock) in an open transaction
+                    if self.conn.in_transaction:
+                        self.conn.rollback()
+
+            if cursor.description is None or not rows:
+                return "No results found for the query.", read_only
+
+            result_str = _format_rows(columns, rows)
+            if remaining:
+                total = len(rows) + remaining
+                result_str += f"\n... (showing first {MAX_RESULT_ROWS} of {total} results)"
+
+            return result_str, read_only
 
-            if result.empty:
-                return "No results found for the query."
+        except Exception as e:
+            return f"Database error: {str(e)}", False
 
-            if len(result) > 10:
-                result_str = result.head(10).to_string(index=False)
-                result_str += f"\n... (showing first 10 of {len(result)} results)"
-            else:
-                result_str = result.to_string(index=False)
+_DB_SINGLETON: Optional[FinancialDatabaseTool] = None
+_DB_SINGLETON_LOCK = threading.Lock()
 
-            return result_str
+def _get_db() -> FinancialDatabaseTool:
+    """Get the shared database tool, reloading tables if the CSVs changed"""
+    global _DB_SINGLETON
+    with _DB_SINGLETON_LOCK:
+        if _DB_SINGLETON is None:
+            _DB_SINGLETON = FinancialDatabaseTool()
+        else:
+            _DB_SINGLETON.setup_database()
+    return _DB_SINGLETON
 
-        except Exception as e:
-            return f"Database error: {str(e)}"
+def on_data_reload(callback: Callable[[], None]):
+    """Register a callback to run whenever the financial data is reloaded"""
+    _RELOAD_CALLBACKS.append(callback)
+
+def refresh_database():
+    """Reload the database tables if the CSVs changed, running reload callbacks"""
+    _get_db()
 
 @tool
 def financial_database_query(query: str) -> str:
@@ -71,19 +236,80 @@ def financial_database_query(query: str) -> str:
     - stock_prices: company, date, open_price, high_price, low_price, close_price, volume
     - economic_indicators: date, indicator, value, period
     """
-    db_tool = FinancialDatabaseTool()
-    return db_tool.query_database(query)
+    return _get_db().query_database(query)
 
 @tool
 def web_search(query: str) -> str:
     """Search the web for current financial information."""
     try:
+        from langchain_community.tools import DuckDuckGoSearchRun
+
         search = DuckDuckGoSearchRun()
         results = search.run(query)
         return results
     except Exception as e:
         return f"Web search error: {str(e)}"
 
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow
+}
+
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+# Integer results are capped (~1233 digits); big-integer arithmetic holds the GIL,
+# so an unbounded power would stall every request in the process
+MAX_RESULT_BITS = 4096
+
+# math.* names the calculator may use; factorial, comb, perm etc. are excluded
+_MATH_NAMES = frozenset({
+    'sqrt', 'exp', 'log', 'log10', 'log2', 'pow', 'fabs', 'floor', 'ceil', 'trunc',
+    'sin', 'cos', 'tan', 'pi', 'e'
+})
+
+@lru_cache(maxsize=256)
+def _parse_expression(expression: str) -> ast.expr:
+    """Parse a calculator expression (cached for repeated expressions)"""
+    return ast.parse(expression, mode='eval').body
+
+def _eval_node(node: ast.expr) -> Any:
+    """Evaluate an arithmetic expression tree, allowing only numbers, operators and listed math names"""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left, right = _eval_node(node.left), _eval_node(node.right)
+        # Estimate the size of a power before computing it
+        if isinstance(node.op, ast.Pow) and abs(left) > 1 and right * math.log2(abs(left)) > MAX_RESULT_BITS:
+            raise ValueError("Result too large")
+        result = _BINARY_OPERATORS[type(node.op)](left, right)
+        if isinstance(result, int) and result.bit_length() > MAX_RESULT_BITS:
+            raise ValueError("Result too large")
+        return result
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_eval_node(node.operand))
+
+    if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+            and node.value.id == 'math' and node.attr in _MATH_NAMES):
+        return getattr(math, node.attr)
+
+    if isinstance(node, ast.Call) and not node.keywords:
+        func = _eval_node(node.func)
+        if not callable(func):
+            raise ValueError("Expression is not callable")
+        return func(*[_eval_node(arg) for arg in node.args])
+
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
 @tool
 def financial_calculator(expression: str) -> str:
     """Perform financial calculations and mathematical operations."""
@@ -92,17 +318,16 @@ def financial_calculator(expression: str) -> str:
 
         # Handle percentage calculations
         if '%' in expression:
-            expression = re.sub(r'(\d+(?:\.\d+)?)%\s+of\s+(\d+(?:\.\d+)?)', 
-                              r'(\1/100) * \2', expression)
-            expression = re.sub(r'(\d+(?:\.\d+)?)%', r'(\1/100)', expression)
+            expression = _PCT_OF.sub(r'(\1/100) * \2', expression)
+            expression = _PCT.sub(r'(\1/100)', expression)
 
         # Safety check
-        allowed_chars = set('0123456789+-*/.() ')
+        allowed_chars = set('0123456789+-*/.()^ ')
         if not all(c in allowed_chars or c.isalnum() for c in expression.replace('**', '^')):
             return "Error: Invalid characters in expression"
 
         expression = expression.replace('^', '**')
-        result = eval(expression, {"__builtins__": {}, "math": math})
+        result = _eval_node(_parse_expression(expression))
 
         if isinstance(result, float):
             if result.is_integer():
@@ -145,43 +370,41 @@ def financial_ratio_calculator(metric_type: str, **kwargs) -> str:
     except Exception as e:
         return f"Calculation error: {str(e)}"
 
+# WHERE clause is built from the filters present so SQLite can search the company/sector
+# indexes; values stay parameterized, giving four fixed statements for the statement cache
+_SENTIMENT_QUERY = """
+SELECT sentiment, COUNT(*) as count, AVG(sentiment_score) as avg_score
+FROM financial_news{where}
+GROUP BY sentiment
+ORDER BY count DESC
+"""
+
 @tool
 def get_market_sentiment(company: str = None, sector: str = None, days: int = 30) -> str:
     """Analyze market sentiment from financial news data."""
     try:
-        db_tool = FinancialDatabaseTool()
-
-        conditions = []
-        if company:
-            conditions.append(f"company = '{company}'")
-        if sector:
-            conditions.append(f"sector = '{sector}'")
-
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
+        filters = [(column, value) for column, value in (("company", company), ("sector", sector)) if value]
+        where = " WHERE " + " AND ".join(f"{column} = ?" for column, _ in filters) if filters else ""
+        params = tuple(value for _, value in filters)
 
-        query = f"""
-        SELECT sentiment, COUNT(*) as count, AVG(sentiment_score) as avg_score
-        FROM financial_news 
-        WHERE {where_clause}
-        GROUP BY sentiment
-        ORDER BY count DESC
-        """
-
-        result = db_tool.query_database(query)
+        # query_database memoizes results and is cleared whenever the CSVs reload
+        result = _get_db().query_database(_SENTIMENT_QUERY.format(where=where), params)
         return f"Market sentiment analysis:\n{result}"
 
     except Exception as e:
         return f"Sentiment analysis error: {str(e)}"
 
+_TOOLS = (
+    financial_database_query,
+    web_search,
+    financial_calculator,
+    financial_ratio_calculator,
+    get_market_sentiment
+)
+
 def get_financial_tools():
-    """Get list of all financial agent tools"""
-    return [
-        financial_database_query,
-        web_search, 
-        financial_calculator,
-        financial_ratio_calculator,
-        get_market_sentiment
-    ]
+    """Get all financial agent tools (a shared, immutable tuple)"""
+    return _TOOLS
 
 if __name__ == "__main__":
     # Test tools
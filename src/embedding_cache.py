@@ -0,0 +1,78 @@
+"""
+Embedding Cache Implementation
+Persists document embeddings keyed by content hash to skip re-embedding on reruns
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List, Dict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# SQLite caps the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+# Vectors are stored as float16: half the bytes of float32, and normalized
+# embeddings lose nothing measurable for cosine/inner-product ranking
+_STORAGE_DTYPE = np.float16
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that stores document vectors in SQLite keyed by content hash"""
+
+    def __init__(self, embeddings: Embeddings, cache_path: str, namespace: str):
+        """Wrap an embedding model; namespace (e.g. the model name) keeps models apart"""
+        self.embeddings = embeddings
+        self.namespace = namespace
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings_fp16 (key TEXT PRIMARY KEY, vector BLOB)")
+        self.conn.commit()
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> str:
+        """Content hash of a text under this cache's namespace"""
+        return hashlib.blake2b(f"{self.namespace}\0{text}".encode(), digest_size=16).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch cached vectors for the given keys"""
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[i:i + _LOOKUP_BATCH]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings_fp16 WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=_STORAGE_DTYPE).astype(np.float32)
+        return found
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, computing only texts not already in the cache"""
+        keys = [self._key(text) for text in texts]
+        vectors = self._lookup(list(set(keys)))
+        hits = sum(key in vectors for key in keys)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            # Round fresh vectors through float16 too, so hits and misses return identical values
+            computed = [
+                np.asarray(vector, dtype=_STORAGE_DTYPE).astype(np.float32)
+                for vector in self.embeddings.embed_documents(list(missing.values()))
+            ]
+            with self._lock:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings_fp16 (key, vector) VALUES (?, ?)",
+                    [(key, vector.astype(_STORAGE_DTYPE).tobytes()) for key, vector in zip(missing, computed)]
+                )
+                self.conn.commit()
+            vectors.update(zip(missing, computed))
+
+        print(f"Embedding cache: {hits} hits, {len(missing)} computed")
+        return [vectors[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query (queries are not cached)"""
+        return self.embeddings.embed_query(text)
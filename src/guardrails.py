@@ -15,6 +15,23 @@ class FinancialGuardrails:
             r"can't.*lose.*money"
         ]
 
+        self.advice_patterns = [
+            re.compile(r"you should (buy|sell|invest)"),
+            re.compile(r"definitely (buy|sell|invest)")
+        ]
+
+        # Matched as plain substrings of the lowercased input, in a single pass
+        self.manipulation_patterns = re.compile("|".join(map(re.escape, [
+            "ignore previous instructions",
+            "act as if you are",
+            "pretend to be"
+        ])))
+
+        # Substring match, so "invest" also covers "investment" and "investing"
+        self.investment_terms = re.compile("|".join(map(re.escape, [
+            'invest', 'buy', 'sell', 'portfolio', 'stock'
+        ])))
+
         self.financial_disclaimer = """
         ⚠️ **Disclaimer**: This analysis is for educational purposes only. 
         Not financial advice. Consult qualified advisors before investing.
@@ -25,15 +42,8 @@ class FinancialGuardrails:
         user_input_lower = user_input.lower()
 
         # Check for manipulation attempts
-        manipulation_patterns = [
-            "ignore previous instructions",
-            "act as if you are",
-            "pretend to be"
-        ]
-
-        for pattern in manipulation_patterns:
-            if pattern in user_input_lower:
-                return False, "System manipulation attempt detected"
+        if self.manipulation_patterns.search(user_input_lower):
+            return False, "System manipulation attempt detected"
 
         return True, ""
 
@@ -42,24 +52,16 @@ class FinancialGuardrails:
         warnings = []
         modified_response = response
 
-        # Check for direct financial advice
-        advice_patterns = [
-            r"you should (buy|sell|invest)",
-            r"definitely (buy|sell|invest)"
-        ]
+        response_lower = response.lower()
 
-        contains_advice = False
-        for pattern in advice_patterns:
-            if re.search(pattern, response.lower()):
-                contains_advice = True
-                break
+        # Check for direct financial advice
+        contains_advice = any(pattern.search(response_lower) for pattern in self.advice_patterns)
 
         # Add disclaimer if needed
-        investment_terms = ['invest', 'buy', 'sell', 'portfolio', 'stock']
-        mentions_investments = any(term in response.lower() for term in investment_terms)
+        mentions_investments = bool(self.investment_terms.search(response_lower))
 
         if contains_advice or mentions_investments:
-            if "disclaimer" not in response.lower():
+            if "disclaimer" not in response_lower:
                 modified_response = response + "\n\n" + self.financial_disclaimer
                 warnings.append("Financial disclaimer added")
 
@@ -1,12 +1,76 @@
 """
 Ollama LLM Client Implementation
 """
-from typing import Optional, List, Dict, Any
-from langchain_ollama import ChatOllama, OllamaEmbeddings
+import threading
+import time
+from typing import Optional, List, Dict, Any, Tuple
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from config import settings
+import httpx
 import requests
 
+# Shared session so /api/tags calls reuse a keep-alive connection
+_SESSION = requests.Session()
+
+TAGS_CACHE_TTL = 30  # seconds
+
+# base_url -> (expiry, models or None if the server was unreachable)
+_tags_cache: Dict[str, Tuple[float, Optional[List[Dict[str, Any]]]]] = {}
+_tags_cache_lock = threading.Lock()
+
+def _fetch_tags(base_url: str) -> Optional[List[Dict[str, Any]]]:
+    """Fetch the installed model list from Ollama, cached for TAGS_CACHE_TTL seconds"""
+    now = time.monotonic()
+    with _tags_cache_lock:
+        cached = _tags_cache.get(base_url)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    try:
+        response = _SESSION.get(f"{base_url}/api/tags", timeout=5)
+        models = response.json().get("models", []) if response.status_code == 200 else None
+    except Exception:
+        models = None
+
+    with _tags_cache_lock:
+        _tags_cache[base_url] = (now + TAGS_CACHE_TTL, models)
+    return models
+
+# Shared async client for event-loop callers, created on first use
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Get the shared pooled httpx client"""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        _ASYNC_CLIENT = httpx.AsyncClient(timeout=5.0)
+    return _ASYNC_CLIENT
+
+async def aclose_http_client():
+    """Close the shared async client (call on application shutdown)"""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
+
+async def _afetch_tags(base_url: str) -> Optional[List[Dict[str, Any]]]:
+    """Async variant of _fetch_tags that does not block the event loop"""
+    now = time.monotonic()
+    with _tags_cache_lock:
+        cached = _tags_cache.get(base_url)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    try:
+        response = await _get_async_client().get(f"{base_url}/api/tags")
+        models = response.json().get("models", []) if response.status_code == 200 else None
+    except Exception:
+        models = None
+
+    with _tags_cache_lock:
+        _tags_cache[base_url] = (now + TAGS_CACHE_TTL, models)
+    return models
+
 class OllamaClient:
     """Ollama client for local LLM inference"""
 
@@ -21,12 +85,16 @@ class OllamaClient:
             print(f"Warning: Ollama server not accessible at {self.base_url}")
             print("Make sure Ollama is running with: ollama serve")
 
-        # Initialize chat model
+        # Initialize chat model (langchain_ollama is only imported when Ollama is used)
         try:
+            from langchain_ollama import ChatOllama, OllamaEmbeddings
+
+            # Keep the model loaded so Ollama can reuse the cached system-prompt prefix
             self.chat_model = ChatOllama(
                 model=self.model,
                 temperature=self.temperature,
-                base_url=self.base_url
+                base_url=self.base_url,
+                keep_alive=settings.OLLAMA_KEEP_ALIVE
             )
 
             # Try to initialize embeddings
@@ -45,23 +113,26 @@ class OllamaClient:
 
     def _check_ollama_status(self) -> bool:
         """Check if Ollama server is running"""
-        try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
-        except Exception:
-            return False
+        return _fetch_tags(self.base_url) is not None
 
     def list_models(self) -> List[str]:
         """List available Ollama models"""
-        try:
-            response = requests.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                return [model["name"] for model in models]
+        models = _fetch_tags(self.base_url)
+        if models is None:
+            print(f"Error listing models: Ollama server not accessible at {self.base_url}")
             return []
-        except Exception as e:
-            print(f"Error listing models: {e}")
+        return [model["name"] for model in models]
+
+    async def acheck_ollama_status(self) -> bool:
+        """Check if Ollama server is running (async)"""
+        return await _afetch_tags(self.base_url) is not None
+
+    async def alist_models(self) -> List[str]:
+        """List available Ollama models (async)"""
+        models = await _afetch_tags(self.base_url)
+        if models is None:
             return []
+        return [model["name"] for model in models]
 
     def chat(self, messages: List[BaseMessage]) -> str:
         """Send chat completion request"""
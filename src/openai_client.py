@@ -2,6 +2,10 @@
 OpenAI LLM Client Implementation
 """
 import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
@@ -31,6 +35,10 @@ class OpenAIClient:
             openai_api_key=settings.OPENAI_API_KEY
         )
 
+        # Embeddings already computed, keyed by content hash (least recently used evicted first)
+        self._embedding_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+
     def chat(self, messages: List[BaseMessage]) -> str:
         """Send chat completion request"""
         try:
@@ -48,10 +56,37 @@ class OpenAIClient:
         ]
         return self.chat(messages)
 
-    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for texts"""
+    def get_embeddings(self, texts: List[str], batch_size: int = 256,
+                       max_workers: int = 8) -> List[List[float]]:
+        """Get embeddings for texts, sending uncached texts in concurrent batches"""
         try:
-            return self.embeddings.embed_documents(texts)
+            keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+
+            # Cached vectors for this call, plus unique texts that still need embedding
+            found: Dict[bytes, List[float]] = {}
+            missing: Dict[bytes, str] = {}
+            with self._embedding_cache_lock:
+                for key, text in zip(keys, texts):
+                    if key in self._embedding_cache:
+                        self._embedding_cache.move_to_end(key)
+                        found[key] = self._embedding_cache[key]
+                    elif key not in missing:
+                        missing[key] = text
+
+            if missing:
+                pending = list(missing.values())
+                batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+                    # map() yields results in submission order
+                    vectors = [v for batch in executor.map(self.embeddings.embed_documents, batches) for v in batch]
+                found.update(zip(missing, vectors))
+
+                with self._embedding_cache_lock:
+                    self._embedding_cache.update(zip(missing, vectors))
+                    while len(self._embedding_cache) > settings.EMBEDDING_CACHE_MAX_ENTRIES:
+                        self._embedding_cache.popitem(last=False)
+
+            return [found[key] for key in keys]
         except Exception as e:
             print(f"Error getting embeddings: {e}")
             raise
@@ -0,0 +1,67 @@
+"""
+Semantic Cache Implementation
+Reuses analysis results for near-identical queries via embedding similarity
+"""
+import threading
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+import numpy as np
+from config import settings
+
+class SemanticCache:
+    """In-memory cache of query results keyed by normalized query embeddings"""
+
+    def __init__(self, embeddings, threshold: float = None, max_entries: int = None):
+        """Initialize cache with an embedding model exposing embed_query"""
+        self.embeddings = embeddings
+        self.threshold = threshold if threshold is not None else settings.SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+
+        self._vectors: Optional[np.ndarray] = None
+        self._results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+        # A miss is usually followed by put() for the same query; reuse its embedding
+        self._embed = lru_cache(maxsize=128)(self._embed_query)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed and L2-normalize a query"""
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, query: str, threshold: float = None) -> Optional[Dict[str, Any]]:
+        """Return a copy of the closest cached result if its similarity clears the threshold"""
+        threshold = self.threshold if threshold is None else threshold
+        if not self._results:
+            return None
+
+        vector = self._embed(query)
+        with self._lock:
+            if self._vectors is None:
+                return None
+            scores = self._vectors @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= threshold:
+                return dict(self._results[best])
+        return None
+
+    def put(self, query: str, result: Dict[str, Any]):
+        """Store a result for a query, evicting the oldest entry when full"""
+        vector = self._embed(query)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = vector[np.newaxis, :]
+            else:
+                self._vectors = np.vstack([self._vectors, vector])
+            self._results.append(dict(result))
+
+            if len(self._results) > self.max_entries:
+                self._vectors = self._vectors[1:]
+                self._results.pop(0)
+
+    def clear(self):
+        """Remove all cached results"""
+        with self._lock:
+            self._vectors = None
+            self._results = []
@@ -1,6 +1,7 @@
 """
 Vector Store Implementation using Chroma and FAISS
 """
+import json
 import os
 import pickle
 from typing import List, Dict, Any, Optional, Tuple
@@ -11,6 +12,59 @@ from langchain_core.documents import Document
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from config import settings
+from src.embedding_cache import CachedEmbeddings
+
+# Source datasets; a saved FAISS index older than any of these is rebuilt
+DATASET_FILES = [
+    'data/financial_news_data.csv',
+    'data/stock_data.csv',
+    'data/economic_indicators.csv'
+]
+
+def _saved_index_is_fresh(folder: str, manifest: Dict[str, Any]) -> bool:
+    """Check that a saved FAISS index was built with the same settings and is newer than every dataset"""
+    paths = [os.path.join(folder, name) for name in ("index.faiss", "index.pkl", "manifest.json")]
+    if not all(os.path.exists(path) for path in paths):
+        return False
+
+    with open(os.path.join(folder, "manifest.json")) as f:
+        if json.load(f) != manifest:
+            return False
+
+    saved_at = min(os.path.getmtime(path) for path in paths)
+    return all(not os.path.exists(path) or os.path.getmtime(path) < saved_at for path in DATASET_FILES)
+
+def _embedding_device() -> str:
+    """Pick the device for the embedding model"""
+    try:
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    except ImportError:
+        return 'cpu'
+
+class FastHFEmbeddings(HuggingFaceEmbeddings):
+    """HuggingFace embeddings that encode under torch.inference_mode with a bounded thread pool"""
+
+    def __init__(self, **kwargs: Any):
+        """Load the model and cap intra-op threads to avoid oversubscribing small batches"""
+        import torch
+
+        super().__init__(**kwargs)
+        torch.set_num_threads(min(8, os.cpu_count() or 1))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents without autograd bookkeeping"""
+        import torch
+
+        with torch.inference_mode():
+            return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query without autograd bookkeeping"""
+        import torch
+
+        with torch.inference_mode():
+            return super().embed_query(text)
 
 class VectorStoreManager:
     """Manages vector databases for RAG operations"""
@@ -21,14 +75,30 @@ class VectorStoreManager:
         self.embedding_model_name = embedding_model or settings.EMBEDDING_MODEL
 
         # Initialize embedding model (using open-source model for compatibility)
-        self.embeddings = HuggingFaceEmbeddings(
+        self.device = _embedding_device()
+        self.base_embeddings = FastHFEmbeddings(
             model_name=self.embedding_model_name,
-            model_kwargs={'device': 'cpu'},
+            model_kwargs={'device': self.device},
             encode_kwargs={'normalize_embeddings': True}
         )
 
+        # Half-precision weights on GPU halve memory and use tensor cores. fp16 rather
+        # than bf16: sentence-transformers converts outputs with .numpy(), which has no
+        # bfloat16. CPU stays fp32, where half precision is usually slower.
+        if self.device == 'cuda':
+            self.base_embeddings.client.half()
+
+        # Document embeddings are persisted by content hash, so reruns only embed new text
+        self.embeddings = CachedEmbeddings(
+            self.base_embeddings,
+            os.path.join(settings.CHROMA_PERSIST_DIRECTORY, "embed_cache.db"),
+            namespace=self.embedding_model_name
+        )
+
         self.vector_store = None
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        # Measure chunks in the embedding model's own tokens so none get truncated
+        self.text_splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+            self.base_embeddings.client.tokenizer,
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP,
             separators=["\n\n", "\n", ". ", " ", ""]
@@ -38,23 +108,19 @@ class VectorStoreManager:
                                       text_column: str, 
                                       metadata_columns: List[str] = None) -> List[Document]:
         """Create LangChain documents from DataFrame"""
-        documents = []
-        metadata_columns = metadata_columns or []
-
-        for idx, row in df.iterrows():
-            page_content = str(row[text_column])
-            metadata = {"source_row": idx}
+        metadata_columns = [col for col in (metadata_columns or []) if col in df.columns]
 
-            for col in metadata_columns:
-                if col in row:
-                    metadata[col] = str(row[col])
+        # Convert whole columns once instead of boxing every row with iterrows()
+        texts = df[text_column].astype(str).to_numpy()
+        meta_rows = df[metadata_columns].astype('string').fillna('').to_numpy().tolist()
 
-            documents.append(Document(
-                page_content=page_content,
-                metadata=metadata
-            ))
-
-        return documents
+        return [
+            Document(
+                page_content=text,
+                metadata={"source_row": idx, **dict(zip(metadata_columns, meta))}
+            )
+            for idx, text, meta in zip(df.index.tolist(), texts, meta_rows)
+        ]
 
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """Split documents into chunks"""
@@ -63,30 +129,142 @@ class VectorStoreManager:
     def create_chroma_store(self, documents: List[Document], 
                            collection_name: str = "financial_data") -> Chroma:
         """Create and populate Chroma vector store"""
+        import chromadb
+        from chromadb.utils.batch_utils import create_batches
+
         persist_dir = settings.CHROMA_PERSIST_DIRECTORY
         os.makedirs(persist_dir, exist_ok=True)
 
-        vector_store = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
+        # Embed everything up front (through the hash cache) in a single pass
+        texts = [doc.page_content for doc in documents]
+        embeddings = self.embeddings.embed_documents(texts)
+
+        # Rebuild the collection so it holds exactly the current documents
+        client = chromadb.PersistentClient(path=persist_dir)
+        try:
+            client.delete_collection(collection_name)
+        except ValueError:
+            pass  # Collection does not exist yet
+        collection = client.create_collection(collection_name)
+
+        # Chroma rejects writes larger than the client's max_batch_size
+        for ids, batch_embeddings, metadatas, batch_texts in create_batches(
+            api=client,
+            ids=[str(i) for i in range(len(documents))],
+            embeddings=embeddings,
+            metadatas=[doc.metadata for doc in documents],
+            documents=texts
+        ):
+            collection.add(ids=ids, embeddings=batch_embeddings, metadatas=metadatas, documents=batch_texts)
+
+        vector_store = Chroma(
+            client=client,
             collection_name=collection_name,
-            persist_directory=persist_dir
+            embedding_function=self.embeddings
         )
 
         print(f"Created Chroma store with {len(documents)} documents")
         return vector_store
 
+    def create_faiss_store(self, documents: List[Document]) -> FAISS:
+        """Create FAISS store on a quantized inner-product index"""
+        import faiss
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores.utils import DistanceStrategy
+
+        # Embeddings are L2-normalized, so inner product equals cosine similarity
+        vectors = np.asarray(
+            self.embeddings.embed_documents([doc.page_content for doc in documents]),
+            dtype=np.float32
+        )
+
+        # Small corpora cannot train the IVF/PQ codebooks, so they keep the flat quantized index
+        use_ivf = len(vectors) >= settings.FAISS_IVF_MIN_VECTORS
+        factory = settings.FAISS_IVF_FACTORY if use_ivf else settings.FAISS_INDEX_FACTORY
+
+        index = faiss.index_factory(vectors.shape[1], factory, faiss.METRIC_INNER_PRODUCT)
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+        if use_ivf:
+            faiss.extract_index_ivf(index).nprobe = settings.FAISS_NPROBE
+
+        ids = [str(i) for i in range(len(documents))]
+        vector_store = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids)),
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+
+        print(f"Created FAISS store ({factory}) with {len(documents)} documents")
+        return vector_store
+
     def initialize_vector_store(self, documents: List[Document]) -> Any:
         """Initialize vector store based on configuration"""
         if self.vector_db_type.lower() == "chroma":
             self.vector_store = self.create_chroma_store(documents)
         elif self.vector_db_type.lower() == "faiss":
-            self.vector_store = FAISS.from_documents(documents, self.embeddings)
+            self.vector_store = self.create_faiss_store(documents)
+            self.save_index(settings.FAISS_INDEX_PATH)
         else:
             raise ValueError(f"Unsupported vector database type: {self.vector_db_type}")
 
         return self.vector_store
 
+    def index_manifest(self) -> Dict[str, Any]:
+        """Settings a saved FAISS index depends on; a mismatch forces a rebuild"""
+        return {
+            "embedding_model": self.embedding_model_name,
+            "index_factory": settings.FAISS_INDEX_FACTORY,
+            "ivf_factory": settings.FAISS_IVF_FACTORY,
+            "ivf_min_vectors": settings.FAISS_IVF_MIN_VECTORS,
+            "chunk_size": settings.CHUNK_SIZE,
+            "chunk_overlap": settings.CHUNK_OVERLAP
+        }
+
+    def save_index(self, folder: str):
+        """Save the FAISS index and its docstore in the layout FAISS.load_local uses"""
+        import faiss
+
+        os.makedirs(folder, exist_ok=True)
+        faiss.write_index(self.vector_store.index, os.path.join(folder, "index.faiss"))
+        with open(os.path.join(folder, "index.pkl"), "wb") as f:
+            pickle.dump((self.vector_store.docstore, self.vector_store.index_to_docstore_id), f)
+        # Written last so a partial save is never treated as fresh
+        with open(os.path.join(folder, "manifest.json"), "w") as f:
+            json.dump(self.index_manifest(), f)
+
+        print(f"Saved FAISS index to {folder}")
+
+    def load_index(self, folder: str) -> FAISS:
+        """Load a saved FAISS store read-only, memory-mapping what the index type allows"""
+        import faiss
+        from langchain_community.vectorstores.utils import DistanceStrategy
+
+        # Only IVF inverted lists are memory-mapped (paged in on demand, shared between
+        # processes); flat/SQ codes are still read into memory, so the default SQ8 index
+        # gains nothing from the flag beyond skipping the rebuild and re-embedding
+        index = faiss.read_index(os.path.join(folder, "index.faiss"),
+                                 faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            # nprobe is a search-time parameter and is not serialized with the index
+            ivf.nprobe = settings.FAISS_NPROBE
+
+        with open(os.path.join(folder, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+
+        self.vector_store = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+        return self.vector_store
+
     def similarity_search(self, query: str, k: int = 5) -> List[Document]:
         """Perform similarity search"""
         if not self.vector_store:
@@ -100,11 +278,18 @@ def process_financial_datasets():
 
     vsm = VectorStoreManager()
 
+    # Reuse the saved FAISS index instead of re-embedding when the datasets are unchanged
+    if vsm.vector_db_type.lower() == "faiss" and _saved_index_is_fresh(settings.FAISS_INDEX_PATH, vsm.index_manifest()):
+        vector_store = vsm.load_index(settings.FAISS_INDEX_PATH)
+        print(f"✓ Loaded saved FAISS index from {settings.FAISS_INDEX_PATH}")
+        return vsm, vector_store
+
     # Load financial data
     try:
-        news_df = pd.read_csv('data/financial_news_data.csv')
-        stock_df = pd.read_csv('data/stock_data.csv')
-        economic_df = pd.read_csv('data/economic_indicators.csv')
+        news_df = pd.read_csv('data/financial_news_data.csv', engine='pyarrow', dtype_backend='pyarrow')
+        stock_df = pd.read_csv('data/stock_data.csv', engine='pyarrow',
+                               dtype={'company': 'category', 'close_price': 'float32', 'volume': 'int64'})
+        economic_df = pd.read_csv('data/economic_indicators.csv', engine='pyarrow')
         print("✓ Loaded financial datasets")
     except FileNotFoundError as e:
         print(f"Error loading datasets: {e}")
@@ -117,16 +302,19 @@ def process_financial_datasets():
         metadata_columns=['date', 'company', 'sector', 'sentiment', 'sentiment_score']
     )
 
-    # Create stock summary documents
-    stock_summaries = []
-    for company in stock_df['company'].unique():
-        company_data = stock_df[stock_df['company'] == company]
-        latest_data = company_data.iloc[-1]
-        summary = f"{company} stock analysis: Latest closing price ${latest_data['close_price']}, Volume: {latest_data['volume']:,}"
-        stock_summaries.append(Document(
-            page_content=summary,
+    # Create stock summary documents from each company's latest row
+    latest = stock_df.sort_values('date', kind='stable').drop_duplicates('company', keep='last')
+    stock_summaries = [
+        Document(
+            page_content=f"{company} stock analysis: Latest closing price ${close_price:.2f}, Volume: {volume:,}",
             metadata={'type': 'stock_summary', 'company': company}
-        ))
+        )
+        for company, close_price, volume in zip(
+            latest['company'].tolist(),
+            latest['close_price'].to_numpy(),
+            latest['volume'].to_numpy()
+        )
+    ]
 
     all_documents = news_docs + stock_summaries
     split_docs = vsm.split_documents(all_documents)
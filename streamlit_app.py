@@ -3,6 +3,7 @@ Streamlit Frontend for Financial RAG System
 """
 import streamlit as st
 import requests
+import orjson
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
@@ -18,6 +19,13 @@ st.set_page_config(
 # API Configuration
 API_BASE_URL = "http://localhost:8000"
 
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Shared HTTP session, kept across reruns so keep-alive connections are reused"""
+    session = requests.Session()
+    session.mount(API_BASE_URL, requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -32,20 +40,22 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_data(ttl=10)
 def check_api_status():
     """Check if FastAPI backend is available"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = get_session().get(f"{API_BASE_URL}/health", timeout=5)
         return response.status_code == 200
     except:
         return False
 
+@st.cache_data(ttl=10)
 def get_system_status():
     """Get system status from API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/status", timeout=10)
+        response = get_session().get(f"{API_BASE_URL}/status", timeout=10)
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         return None
     except:
         return None
@@ -56,19 +66,42 @@ def query_financial_agent(query: str):
         payload = {"query": query, "use_rag": True, "use_tools": True}
 
         with st.spinner("🤖 Analyzing your query..."):
-            response = requests.post(
+            response = get_session().post(
                 f"{API_BASE_URL}/analyze",
-                json=payload,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
                 timeout=60
             )
 
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         else:
             return {"error": f"API error: {response.status_code}"}
     except Exception as e:
         return {"error": f"Request failed: {str(e)}"}
 
+@st.cache_data
+def build_sentiment_fig():
+    """Build the market sentiment pie chart once and reuse it across reruns"""
+    sentiment_data = pd.DataFrame({
+        'Sentiment': ['Positive', 'Neutral', 'Negative'],
+        'Count': [45, 30, 25]
+    })
+
+    return px.pie(sentiment_data, values='Count', names='Sentiment',
+                  title="Market Sentiment Distribution")
+
+@st.cache_data
+def build_sector_fig():
+    """Build the sector performance bar chart once and reuse it across reruns"""
+    sector_data = pd.DataFrame({
+        'Sector': ['Technology', 'Finance', 'Healthcare', 'Energy'],
+        'Performance': [8.2, -2.1, 5.4, -1.8]
+    })
+
+    return px.bar(sector_data, x='Sector', y='Performance',
+                  title="Sector Performance (%)")
+
 def main():
     """Main Streamlit application"""
 
@@ -181,25 +214,11 @@ def main():
 
         with col1:
             st.subheader("📈 Market Sentiment")
-            sentiment_data = pd.DataFrame({
-                'Sentiment': ['Positive', 'Neutral', 'Negative'],
-                'Count': [45, 30, 25]
-            })
-
-            fig = px.pie(sentiment_data, values='Count', names='Sentiment', 
-                        title="Market Sentiment Distribution")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_sentiment_fig(), use_container_width=True)
 
         with col2:
             st.subheader("📊 Sector Performance")
-            sector_data = pd.DataFrame({
-                'Sector': ['Technology', 'Finance', 'Healthcare', 'Energy'],
-                'Performance': [8.2, -2.1, 5.4, -1.8]
-            })
-
-            fig = px.bar(sector_data, x='Sector', y='Performance',
-                        title="Sector Performance (%)")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_sector_fig(), use_container_width=True)
 
         # Key metrics
         st.subheader("📉 Key Economic Indicators")
@@ -219,6 +238,7 @@ def main():
         st.header("🔧 System Information")
 
         if st.button("🔄 Refresh System Status"):
+            get_system_status.clear()
             status = get_system_status()
             if status:
                 st.json(status)
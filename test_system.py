@@ -3,6 +3,9 @@ Test Script for Financial RAG System
 """
 import sys
 import os
+import io
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append('.')
 sys.path.append('src')
 
@@ -22,9 +25,10 @@ def test_data_loading():
     print("🧪 Testing data loading...")
     try:
         import pandas as pd
-        news_df = pd.read_csv('data/financial_news_data.csv')
-        stock_df = pd.read_csv('data/stock_data.csv')
-        econ_df = pd.read_csv('data/economic_indicators.csv')
+        news_df = pd.read_csv('data/financial_news_data.csv', engine='pyarrow', dtype_backend='pyarrow')
+        stock_df = pd.read_csv('data/stock_data.csv', engine='pyarrow',
+                               dtype={'company': 'category', 'close_price': 'float32', 'volume': 'int64'})
+        econ_df = pd.read_csv('data/economic_indicators.csv', engine='pyarrow')
 
         print(f"✅ Data loaded - News: {len(news_df)}, Stocks: {len(stock_df)}, Indicators: {len(econ_df)}")
         return True
@@ -68,29 +72,67 @@ def test_agent_tools():
         print(f"✅ Loaded {len(tools)} agent tools")
 
         # Test calculator
-        result = financial_calculator("10 + 5 * 2")
+        result = financial_calculator.run("10 + 5 * 2")
         print(f"✅ Calculator test: 10 + 5 * 2 = {result}")
 
+        # Supported syntax: powers, percentages and math.* functions
+        for expression, expected in [("2**10", "1024"), ("5% of 200", "10"), ("math.sqrt(16)", "4")]:
+            result = financial_calculator.run(expression)
+            assert result == expected, f"{expression} returned {result!r}, expected {expected!r}"
+        print("✅ Calculator handles powers, percentages and math functions")
+
+        # Rejected: oversized (including nested) powers, unlisted math functions,
+        # builtins/names and non-numeric constants
+        for expression in ["9**9**9", "((10**1000)**1000)**100", "math.factorial(100000)",
+                           "__import__('os')", "abs(-1)", "True"]:
+            result = financial_calculator.run(expression)
+            assert "error" in result.lower(), f"{expression} was not rejected: {result!r}"
+        print("✅ Calculator rejects unsafe expressions")
+
+        # Test CSV column typing and result formatting used by the database tool
+        from src.agent_tools import _infer_column_type, _format_rows
+
+        for values, expected in [(['1', '', '2'], 'INTEGER'), (['1', '2.5'], 'REAL'), (['1', 'TechCorp'], 'TEXT')]:
+            column_type = _infer_column_type(values)
+            assert column_type == expected, f"{values} typed as {column_type}, expected {expected}"
+
+        table = _format_rows(['company', 'close_price'], [('TechCorp', 117.27), ('HealthPlus', None)])
+        expected_table = "   company close_price\n  TechCorp      117.27\nHealthPlus         NaN"
+        assert table == expected_table, f"Unexpected table layout:\n{table}"
+        print("✅ Database column typing and result formatting")
+
         return True
     except Exception as e:
         print(f"❌ Agent tools test failed: {e}")
         return False
 
+TESTS = [
+    'test_configuration',
+    'test_data_loading',
+    'test_llm_clients',
+    'test_agent_tools'
+]
+
+def _run_test(name):
+    """Run one test in a worker process, capturing its output"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        result = globals()[name]()
+    return result, output.getvalue()
+
 def main():
     """Run all tests"""
     print("🚀 Running Financial RAG System Tests\n")
 
-    tests = [
-        test_configuration,
-        test_data_loading,
-        test_llm_clients,
-        test_agent_tools
-    ]
+    # Tests are independent and import-bound, so run them in separate processes.
+    # Imports stay inside each test so a missing dependency fails only that test.
+    with ProcessPoolExecutor(max_workers=len(TESTS)) as executor:
+        outcomes = list(executor.map(_run_test, TESTS))
 
     results = []
-    for test in tests:
-        results.append(test())
-        print()
+    for result, output in outcomes:
+        print(output)
+        results.append(result)
 
     passed = sum(results)
     total = len(results)
@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
+
+# Fixed seed so regenerated data is reproducible run to run
+SEED = 42
 
 print("🔄 Updating financial data with consistent company profiles...")
 
@@ -14,73 +15,79 @@ companies = {
     'RetailMax': {'sector': 'Retail', 'business': 'e-commerce and retail operations'}
 }
 
+# Headline templates per sector
+HEADLINE_TEMPLATES = {
+    'Technology': [
+        '{company} reports strong Q3 cloud revenue growth',
+        '{company} announces new AI product launch',
+        '{company} expands data center operations globally',
+        '{company} faces cybersecurity investigation',
+        '{company} partners with major enterprise clients'
+    ],
+    'Healthcare': [
+        '{company} receives FDA approval for new medical device',
+        '{company} reports positive clinical trial results',
+        '{company} expands pharmaceutical research division',
+        '{company} faces regulatory inquiry on drug pricing',
+        '{company} announces healthcare technology partnership'
+    ],
+    'Finance': [
+        '{company} reports record quarterly earnings',
+        '{company} expands digital banking services',
+        '{company} increases lending portfolio',
+        '{company} faces regulatory capital requirements',
+        '{company} announces fintech acquisition'
+    ],
+    'Energy': [
+        '{company} completes major solar farm project',
+        '{company} reports renewable energy growth',
+        '{company} expands wind power operations',
+        '{company} faces environmental compliance review',
+        '{company} announces clean energy investment'
+    ],
+    'Retail': [
+        '{company} reports strong holiday sales',
+        '{company} expands e-commerce platform',
+        '{company} opens new distribution centers',
+        '{company} faces supply chain disruptions',
+        '{company} announces loyalty program enhancement'
+    ]
+}
+
 # Create better news headlines that match companies
-news_data = []
-for i, (company, profile) in enumerate(companies.items()):
-    sector = profile['sector']
-    
-    if sector == 'Technology':
-        headlines = [
-            f'{company} reports strong Q3 cloud revenue growth',
-            f'{company} announces new AI product launch',
-            f'{company} expands data center operations globally',
-            f'{company} faces cybersecurity investigation',
-            f'{company} partners with major enterprise clients'
-        ]
-    elif sector == 'Healthcare':
-        headlines = [
-            f'{company} receives FDA approval for new medical device',
-            f'{company} reports positive clinical trial results',
-            f'{company} expands pharmaceutical research division',
-            f'{company} faces regulatory inquiry on drug pricing',
-            f'{company} announces healthcare technology partnership'
-        ]
-    elif sector == 'Finance':
-        headlines = [
-            f'{company} reports record quarterly earnings',
-            f'{company} expands digital banking services',
-            f'{company} increases lending portfolio',
-            f'{company} faces regulatory capital requirements',
-            f'{company} announces fintech acquisition'
-        ]
-    elif sector == 'Energy':
-        headlines = [
-            f'{company} completes major solar farm project',
-            f'{company} reports renewable energy growth',
-            f'{company} expands wind power operations',
-            f'{company} faces environmental compliance review',
-            f'{company} announces clean energy investment'
-        ]
-    else:  # Retail
-        headlines = [
-            f'{company} reports strong holiday sales',
-            f'{company} expands e-commerce platform',
-            f'{company} opens new distribution centers',
-            f'{company} faces supply chain disruptions',
-            f'{company} announces loyalty program enhancement'
-        ]
-    
-    # Generate news for each company
-    for j, headline in enumerate(headlines):
-        sentiment = ['positive', 'negative', 'neutral'][j % 3]
-        sentiment_score = random.uniform(0.6, 0.9) if sentiment == 'positive' else random.uniform(-0.9, -0.6) if sentiment == 'negative' else random.uniform(-0.1, 0.1)
-        
-        date = datetime.now() - timedelta(days=random.randint(1, 30))
-        
-        news_data.append({
-            'id': len(news_data) + 1,
-            'date': date.strftime('%Y-%m-%d'),
-            'company': company,
-            'sector': sector,
-            'headline': headline,
-            'sentiment': sentiment,
-            'sentiment_score': round(sentiment_score, 3),
-            'market_impact': random.choice(['high', 'medium', 'low']),
-            'source': random.choice(['Reuters', 'Bloomberg', 'WSJ', 'Financial Times'])
-        })
+rows = [
+    (company, profile['sector'], j, template.format(company=company))
+    for company, profile in companies.items()
+    for j, template in enumerate(HEADLINE_TEMPLATES[profile['sector']])
+]
+company_col, sector_col, position, headline_col = (np.array(col) for col in zip(*rows))
+n_rows = len(rows)
+
+# Generate every column with one vectorized call instead of per-row random draws
+rng = np.random.default_rng(SEED)
+
+sentiment = np.array(['positive', 'negative', 'neutral'])[position % 3]
+sentiment_score = np.select(
+    [sentiment == 'positive', sentiment == 'negative'],
+    [rng.uniform(0.6, 0.9, n_rows), rng.uniform(-0.9, -0.6, n_rows)],
+    default=rng.uniform(-0.1, 0.1, n_rows)
+).round(3).astype(np.float32)
+
+dates = pd.Timestamp.now() - pd.to_timedelta(rng.integers(1, 31, n_rows), unit='D')
+
+news_df = pd.DataFrame({
+    'id': np.arange(1, n_rows + 1),
+    'date': dates.strftime('%Y-%m-%d'),
+    'company': company_col,
+    'sector': sector_col,
+    'headline': headline_col,
+    'sentiment': sentiment,
+    'sentiment_score': sentiment_score,
+    'market_impact': rng.choice(['high', 'medium', 'low'], n_rows),
+    'source': rng.choice(['Reuters', 'Bloomberg', 'WSJ', 'Financial Times'], n_rows)
+})
 
 # Save improved data
-news_df = pd.DataFrame(news_data)
 news_df.to_csv('data/financial_news_data.csv', index=False)
-print(f'✅ Updated financial news with {len(news_data)} consistent records')
+print(f'✅ Updated financial news with {n_rows} consistent records')
 print('✅ Data updated successfully!')